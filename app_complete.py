@@ -4,15 +4,19 @@ Handles numpy/pandas gracefully while maintaining full API functionality
 """
 from flask import Flask, request, jsonify, send_file, g
 from flask_cors import CORS
+import csv
 import json
 import os
 from datetime import datetime, timedelta
 import tempfile
-from io import BytesIO, StringIO
+from io import BytesIO, StringIO, TextIOWrapper
 import logging
+import secrets
+import threading
 import uuid
 import time
 import sys
+from operator import itemgetter
 from logging.handlers import RotatingFileHandler
 
 # Try to import pandas/numpy with fallback
@@ -107,10 +111,61 @@ if FULL_SERVICES_AVAILABLE:
 if not FULL_SERVICES_AVAILABLE:
     app.exports_storage = {}
 
+# Fallback export files are kept on disk; exports_storage only holds their metadata
+FALLBACK_EXPORT_DIR = os.path.join(tempfile.gettempdir(), 'ybb_fallback_exports')
+FALLBACK_EXPORT_TTL = timedelta(hours=24)
+# Guards app.exports_storage across gunicorn gthread request threads
+exports_storage_lock = threading.Lock()
+
+def store_fallback_export_file(export_id, file_content, filename):
+    """Write fallback export content to disk and return its path"""
+    os.makedirs(FALLBACK_EXPORT_DIR, exist_ok=True)
+    extension = os.path.splitext(filename)[1] or '.bin'
+    file_path = os.path.join(FALLBACK_EXPORT_DIR, f"{export_id}{extension}")
+    with open(file_path, 'wb') as f:
+        f.write(file_content)
+    return file_path
+
+def remove_fallback_export(export_id):
+    """Drop a fallback export and delete its file"""
+    with exports_storage_lock:
+        export_info = app.exports_storage.pop(export_id, None)
+    if export_info:
+        try:
+            os.remove(export_info["file_path"])
+        except OSError:
+            pass
+
+def cleanup_expired_fallback_exports():
+    """Remove fallback exports that have passed their expiration time"""
+    now = datetime.now()
+    with exports_storage_lock:
+        expired = [export_id for export_id, export_info in app.exports_storage.items()
+                   if export_info["expires_at"] < now]
+    for export_id in expired:
+        remove_fallback_export(export_id)
+    
+    # Sweep the directory by age too: files written by recycled or restarted
+    # workers have no metadata left in this process's exports_storage
+    cutoff = time.time() - FALLBACK_EXPORT_TTL.total_seconds()
+    removed_files = 0
+    try:
+        with os.scandir(FALLBACK_EXPORT_DIR) as entries:
+            for entry in entries:
+                try:
+                    if entry.is_file() and entry.stat().st_mtime < cutoff:
+                        os.remove(entry.path)
+                        removed_files += 1
+                except OSError:
+                    continue
+    except OSError:
+        pass
+    return len(expired) + removed_files
+
 @app.before_request
 def before_request():
     """Before request handler"""
-    g.request_id = str(uuid.uuid4())[:8]
+    g.request_id = secrets.token_hex(4)
     g.start_time = time.time()
     
     logger.info(
@@ -157,23 +212,35 @@ def create_csv_export(data, filename=None):
         # Get headers from first item
         headers = list(data[0].keys()) if isinstance(data[0], dict) else ["data"]
         
-        csv_lines = []
-        csv_lines.append(",".join(f'"{header}"' for header in headers))
+        output = BytesIO()
+        text_stream = TextIOWrapper(output, encoding='utf-8', newline='')
+        writer = csv.writer(text_stream, quoting=csv.QUOTE_ALL, lineterminator='\n')
+        writer.writerow(headers)
+        
+        # itemgetter returns a bare value (not a tuple) for a single key
+        if len(headers) == 1:
+            get_single = itemgetter(headers[0])
+            get_row = lambda item: (get_single(item),)
+        else:
+            get_row = itemgetter(*headers)
         
         for item in data:
             if isinstance(item, dict):
-                row = []
-                for header in headers:
-                    value = str(item.get(header, "")).replace('"', '""')
-                    row.append(f'"{value}"')
-                csv_lines.append(",".join(row))
+                try:
+                    writer.writerow(get_row(item))
+                except KeyError:
+                    # Sparse record - fall back to per-column defaults
+                    writer.writerow([item.get(header, "") for header in headers])
             else:
-                csv_lines.append(f'"' + str(item).replace('"', '""') + '"')
+                writer.writerow([item])
+        
+        text_stream.flush()
+        text_stream.detach()
+        csv_content = output.getvalue()
         
-        csv_content = "\n".join(csv_lines)
         final_filename = filename or f"export_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
         
-        return csv_content.encode('utf-8'), final_filename
+        return csv_content, final_filename
     
     return None, None
 
@@ -261,19 +328,26 @@ def export_participants():
                 "request_id": g.request_id
             }), 500
         
-        # Store export
-        app.exports_storage[export_id] = {
+        # Store export on disk, keeping only metadata in memory
+        cleanup_expired_fallback_exports()
+        file_path = store_fallback_export_file(export_id, file_content, final_filename)
+        
+        expires_at = datetime.now() + FALLBACK_EXPORT_TTL
+        export_info = {
             "export_id": export_id,
             "status": "success",
             "export_type": "participants",
             "template": request_data.get('template', 'standard'),
             "format": format_type,
             "record_count": len(data),
-            "file_content": file_content,
+            "file_path": file_path,
+            "file_size": len(file_content),
             "filename": final_filename,
             "created_at": datetime.now(),
-            "expires_at": datetime.now() + timedelta(hours=24)
+            "expires_at": expires_at
         }
+        with exports_storage_lock:
+            app.exports_storage[export_id] = export_info
         
         return jsonify({
             "status": "success",
@@ -284,7 +358,7 @@ def export_participants():
                 "file_size": len(file_content),
                 "record_count": len(data),
                 "download_url": f"/api/ybb/export/{export_id}/download",
-                "expires_at": app.exports_storage[export_id]["expires_at"].isoformat()
+                "expires_at": expires_at.isoformat()
             },
             "metadata": {
                 "export_type": "participants",
@@ -366,18 +440,17 @@ def download_export(export_id):
                 logger.warning(f"Full service download failed, using fallback: {str(e)}")
         
         # Fallback implementation
-        if export_id not in app.exports_storage:
+        export_info = app.exports_storage.get(export_id)
+        if export_info is None:
             return jsonify({
                 "status": "error",
                 "message": "Export file not found or expired",
                 "request_id": g.request_id
             }), 404
         
-        export_info = app.exports_storage[export_id]
-        
         # Check expiration
         if export_info["expires_at"] < datetime.now():
-            del app.exports_storage[export_id]
+            remove_fallback_export(export_id)
             return jsonify({
                 "status": "error",
                 "message": "Export file has expired",
@@ -394,7 +467,7 @@ def download_export(export_id):
             content_type = 'application/octet-stream'
         
         return send_file(
-            BytesIO(export_info["file_content"]),
+            export_info["file_path"],
             as_attachment=True,
             download_name=filename,
             mimetype=content_type
@@ -422,15 +495,14 @@ def export_status(export_id):
                 logger.warning(f"Full service status check failed: {str(e)}")
         
         # Fallback implementation
-        if export_id not in app.exports_storage:
+        export_info = app.exports_storage.get(export_id)
+        if export_info is None:
             return jsonify({
                 "status": "error",
                 "message": "Export not found",
                 "request_id": g.request_id
             }), 404
         
-        export_info = app.exports_storage[export_id]
-        
         return jsonify({
             "status": "success",
             "data": {
@@ -438,7 +510,7 @@ def export_status(export_id):
                 "status": export_info.get("status", "completed"),
                 "export_type": export_info.get("export_type", "unknown"),
                 "record_count": export_info.get("record_count", 0),
-                "file_size": len(export_info.get("file_content", b"")),
+                "file_size": export_info.get("file_size", 0),
                 "created_at": export_info.get("created_at", datetime.now()).isoformat(),
                 "expires_at": export_info.get("expires_at", datetime.now()).isoformat()
             },
@@ -466,8 +538,10 @@ def storage_info():
                 logger.warning(f"Full service storage info failed: {str(e)}")
         
         # Fallback implementation
-        total_exports = len(app.exports_storage)
-        total_size = sum(len(export_info.get("file_content", b"")) for export_info in app.exports_storage.values())
+        with exports_storage_lock:
+            stored_exports = list(app.exports_storage.values())
+        total_exports = len(stored_exports)
+        total_size = sum(export_info.get("file_size", 0) for export_info in stored_exports)
         
         return jsonify({
             "total_exports": total_exports,
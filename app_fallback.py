@@ -3,12 +3,14 @@ Fallback app.py for production deployment with numpy/pandas issues
 """
 from flask import Flask, request, jsonify, g
 from flask_cors import CORS
+import csv
 import json
 import os
 from datetime import datetime
 import tempfile
-from io import BytesIO
+from io import BytesIO, TextIOWrapper
 import logging
+import secrets
 import uuid
 import time
 import sys
@@ -43,7 +45,7 @@ def health():
         "service": "YBB Data Processing Service",
         "version": "1.0.0",
         "pandas_available": PANDAS_AVAILABLE,
-        "request_id": str(uuid.uuid4())[:8]
+        "request_id": secrets.token_hex(4)
     })
 
 # Temporary export endpoint that works without pandas
@@ -54,17 +56,25 @@ def export_participants_fallback():
         data = request.get_json()
         export_id = str(uuid.uuid4())
         
-        # Create a simple CSV without pandas
-        csv_content = "id,name,email\n"
-        for item in data.get('data', []):
-            csv_content += f"{item.get('id', '')},{item.get('name', '')},{item.get('email', '')}\n"
+        # Create a simple CSV without pandas; csv.writer handles quoting in C
+        output = BytesIO()
+        text_stream = TextIOWrapper(output, encoding='utf-8', newline='')
+        writer = csv.writer(text_stream, lineterminator='\n')
+        writer.writerow(['id', 'name', 'email'])
+        writer.writerows(
+            (item.get('id', ''), item.get('name', ''), item.get('email', ''))
+            for item in data.get('data', [])
+        )
+        text_stream.flush()
+        text_stream.detach()
+        csv_content = output.getvalue()
         
         # Store in memory (temporary solution)
         if not hasattr(app, 'exports_storage'):
             app.exports_storage = {}
             
         app.exports_storage[export_id] = {
-            'content': csv_content.encode('utf-8'),
+            'content': csv_content,
             'filename': data.get('filename', f'export_{export_id}.csv'),
             'created_at': datetime.now()
         }
@@ -122,14 +132,14 @@ def not_found(error):
         "error": "Endpoint not found",
         "method": request.method,
         "url": request.url,
-        "request_id": str(uuid.uuid4())[:8]
+        "request_id": secrets.token_hex(4)
     }), 404
 
 @app.errorhandler(500)
 def internal_error(error):
     return jsonify({
         "error": "Internal server error",
-        "request_id": str(uuid.uuid4())[:8]
+        "request_id": secrets.token_hex(4)
     }), 500
 
 if __name__ == '__main__':
@@ -4,29 +4,55 @@ YBB Data Management Service - Fallback Application
 Minimal Flask app that works with basic dependencies only
 """
 
+import json
 import os
 import sys
+import time
 import logging
+import importlib
+import importlib.util
 from datetime import datetime
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Health probes hit the timestamp every few seconds; format it at most once per second
+# (second, formatted) is swapped as one tuple so request threads never see a torn pair
+_timestamp_cache = (0, '')
+
+def iso_now():
+    """Return the current local time as an ISO string, cached per second"""
+    global _timestamp_cache
+    now = int(time.time())
+    cached_second, cached_iso = _timestamp_cache
+    if now != cached_second:
+        cached_iso = datetime.fromtimestamp(now).isoformat()
+        _timestamp_cache = (now, cached_iso)
+    return cached_iso
+
+# Dependency availability cannot change within a process, so probe each module once
+_dependency_cache = {}
+
 def create_minimal_app():
     """Create minimal Flask app with only essential features"""
     try:
-        from flask import Flask, jsonify, request
+        from flask import Flask, Response, jsonify, request
         
         app = Flask(__name__)
         
-        # Try to import CORS, but continue without it if not available
-        try:
-            from flask_cors import CORS
-            CORS(app)
-            logger.info("✅ CORS enabled")
-        except ImportError:
-            logger.warning("⚠️ flask_cors not available, continuing without CORS")
+        # CORS can be switched off for health-only fallback deployments,
+        # which then skip importing flask_cors entirely
+        if os.environ.get('ENABLE_CORS', 'True').lower() == 'true':
+            # Try to import CORS, but continue without it if not available
+            try:
+                from flask_cors import CORS
+                CORS(app)
+                logger.info("✅ CORS enabled")
+            except ImportError:
+                logger.warning("⚠️ flask_cors not available, continuing without CORS")
+        else:
+            logger.info("ℹ️ CORS disabled via ENABLE_CORS")
         
         @app.route('/')
         def index():
@@ -34,7 +60,7 @@ def create_minimal_app():
                 'service': 'YBB Data Management API',
                 'status': 'running',
                 'version': '1.0.0-minimal',
-                'timestamp': datetime.now().isoformat(),
+                'timestamp': iso_now(),
                 'dependencies': {
                     'pandas': check_dependency('pandas'),
                     'numpy': check_dependency('numpy'),
@@ -45,14 +71,21 @@ def create_minimal_app():
                 }
             })
         
+        # Everything but the timestamp is fixed for the process lifetime
+        health_base = {
+            'status': 'healthy',
+            'timestamp': None,
+            'python_version': sys.version,
+            'working_directory': os.getcwd()
+        }
+        
         @app.route('/health')
         def health():
-            return jsonify({
-                'status': 'healthy',
-                'timestamp': datetime.now().isoformat(),
-                'python_version': sys.version,
-                'working_directory': os.getcwd()
-            })
+            health_base['timestamp'] = iso_now()
+            return Response(
+                json.dumps(health_base, separators=(',', ':')),
+                mimetype='application/json'
+            )
         
         @app.route('/api/test')
         def api_test():
@@ -130,11 +163,28 @@ def create_minimal_app():
 
 def check_dependency(module_name):
     """Check if a dependency is available"""
+    cached = _dependency_cache.get(module_name)
+    if cached is not None:
+        return cached
+    
+    # find_spec is a cheap negative check: a module it cannot locate is not
+    # installed, so there is nothing to import
     try:
-        __import__(module_name)
-        return True
-    except ImportError:
-        return False
+        available = importlib.util.find_spec(module_name) is not None
+    except (ImportError, ValueError):
+        available = False
+    
+    # A located module can still fail to import (e.g. a C extension missing
+    # its shared libraries), so confirm positives with a real import once
+    if available:
+        try:
+            importlib.import_module(module_name)
+        except Exception as e:
+            logger.warning(f"⚠️ {module_name} is installed but failed to import: {e}")
+            available = False
+    
+    _dependency_cache[module_name] = available
+    return available
 
 def main():
     """Main application entry point"""
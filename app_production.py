@@ -12,7 +12,7 @@ import tempfile
 from io import BytesIO
 from werkzeug.utils import secure_filename
 import logging
-import uuid
+import secrets
 import shutil
 import time
 import sys
@@ -136,7 +136,7 @@ def setup_middleware(app):
     @app.before_request
     def before_request():
         g.start_time = time.time()
-        g.request_id = str(uuid.uuid4())[:8]
+        g.request_id = secrets.token_hex(4)
         
         # Log incoming request
         try:
@@ -1,21 +1,80 @@
 """
 Enhanced Excel Service - Fixed version with comprehensive validation
 """
-from utils.excel_exporter import ExcelExporter
 from io import BytesIO
-import tempfile
 import os
-from openpyxl import load_workbook, Workbook
+import importlib.util
+import tempfile
+from datetime import datetime, timezone
 import mimetypes
+from functools import partial
+from types import SimpleNamespace
+from itertools import chain
+from operator import itemgetter
 import logging
+import hashlib
+import pickle
+import re
+import time
+import zipfile
+from xml.sax.saxutils import unescape
 
 logger = logging.getLogger(__name__)
 
+# Content-addressed cache of generated workbooks, keyed on the input data and sheet name
+EXCEL_CACHE_DIR = os.environ.get(
+    'EXCEL_CACHE_DIR',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'temp', 'excel_cache')
+)
+# openpyxl (and pandas, via ExcelExporter) are imported on first use to keep cold starts light
+_openpyxl = None
+
+def _load_openpyxl():
+    """Import openpyxl once and build the shared header styles alongside it"""
+    global _openpyxl
+    if _openpyxl is None:
+        from openpyxl import load_workbook, Workbook
+        from openpyxl.cell import WriteOnlyCell
+        from openpyxl.styles import Border, Font, Side
+        from openpyxl.writer.excel import ExcelWriter
+        
+        _openpyxl = SimpleNamespace(
+            Workbook=Workbook,
+            load_workbook=load_workbook,
+            WriteOnlyCell=WriteOnlyCell,
+            ExcelWriter=ExcelWriter,
+            # Built once, never per cell; openpyxl deduplicates styles by value
+            header_font=Font(bold=True),
+            header_border=Border(bottom=Side(style='thin'))
+        )
+    return _openpyxl
+
+# Library writers whose OOXML output doesn't need structural validation
+TRUSTED_BACKENDS = frozenset({"xlsxwriter_fast", "pandas_basic"})
+
+# Keep each sheet well under Excel's 1,048,576-row limit and openable at normal speed
+MAX_ROWS_PER_SHEET = int(os.environ.get('EXCEL_MAX_ROWS_PER_SHEET', 500000))
+# Deflate level for openpyxl output; 1 trades slightly larger files for cheaper
+# compression than zlib's default of 6
+EXCEL_ZIP_COMPRESSLEVEL = int(os.environ.get('EXCEL_ZIP_COMPRESSLEVEL', 1))
+# Also open every workbook with openpyxl during validation (slow; for debugging bad output)
+EXCEL_THOROUGH_VALIDATION = os.environ.get('EXCEL_THOROUGH_VALIDATION', 'False').lower() == 'true'
+
+EXCEL_CACHE_TTL_SECONDS = int(os.environ.get('EXCEL_CACHE_TTL_HOURS', 24)) * 3600
+
+# Filename sanitization patterns
+_INVALID_FILENAME_CHARS = re.compile(r'[<>:"/\\|?*]')
+_REPEATED_UNDERSCORES = re.compile(r'_+')
+
+# Sheet entries in xl/workbook.xml, used for structural validation without openpyxl
+_SHEET_NAME_PATTERN = re.compile(rb'<(?:\w+:)?sheet\b[^>]*?\bname="([^"]*)"')
+
 class RobustExcelService:
     """Enhanced Excel service with comprehensive validation and fixing"""
     
     @staticmethod
-    def create_excel_file_robust(data, filename=None, sheet_name="Data"):
+    def create_excel_file_robust(data, filename=None, sheet_name="Data", use_cache=True,
+                                 max_rows_per_sheet=MAX_ROWS_PER_SHEET, trust_backend=True):
         """
         Create Excel file with multiple fallbacks and validation
         
@@ -23,6 +82,10 @@ class RobustExcelService:
             data: List of dictionaries or pandas DataFrame
             filename: Output filename (will be validated/fixed)
             sheet_name: Excel sheet name
+            use_cache: Reuse a previously generated workbook for identical input
+            max_rows_per_sheet: Larger inputs are split across numbered sheets
+            trust_backend: Only run size/header checks on output from TRUSTED_BACKENDS;
+                sheets_count and sheet_names are then None, since the sheets aren't read
             
         Returns:
             tuple: (file_content_bytes, validated_filename, validation_info)
@@ -32,13 +95,32 @@ class RobustExcelService:
         fixed_filename = RobustExcelService._fix_filename(filename)
         logger.info(f"Creating Excel file: {fixed_filename}")
         
+        cache_path = None
+        if use_cache:
+            cache_path = RobustExcelService._get_cache_path(data, sheet_name, max_rows_per_sheet)
+            cached = RobustExcelService._read_cached_export(cache_path)
+            if cached is not None:
+                validation_info = RobustExcelService._validate_excel_content(cached)
+                if validation_info['valid']:
+                    return cached, fixed_filename, validation_info
+                logger.warning(f"Discarding invalid Excel cache entry: {validation_info['errors']}")
+        
         # Step 2: Try multiple creation methods
         methods = [
-            ("ExcelExporter", RobustExcelService._create_with_excel_exporter),
-            ("pandas_basic", RobustExcelService._create_with_pandas_basic),
-            ("openpyxl_manual", RobustExcelService._create_with_openpyxl)
+            ("xlsxwriter_fast", partial(RobustExcelService._create_with_xlsxwriter,
+                                        max_rows_per_sheet=max_rows_per_sheet)),
+            ("ExcelExporter", RobustExcelService._create_with_excel_exporter)
         ]
+        if len(data) > max_rows_per_sheet:
+            # Only xlsxwriter splits into sheets; ExcelExporter stays as the sanitizing fallback
+            logger.info(f"Splitting {len(data)} rows into sheets of {max_rows_per_sheet}")
+        else:
+            methods += [
+                ("pandas_basic", RobustExcelService._create_with_pandas_basic),
+                ("openpyxl_manual", RobustExcelService._create_with_openpyxl)
+            ]
         
+        result = None
         for method_name, method_func in methods:
             try:
                 logger.info(f"Attempting Excel creation with: {method_name}")
@@ -46,11 +128,15 @@ class RobustExcelService:
                 file_content = method_func(data, sheet_name)
                 
                 # Validate the created file
-                validation_info = RobustExcelService._validate_excel_content(file_content)
+                if trust_backend and method_name in TRUSTED_BACKENDS:
+                    validation_info = RobustExcelService._cheap_validate(file_content)
+                else:
+                    validation_info = RobustExcelService._validate_excel_content(file_content)
                 
                 if validation_info['valid']:
                     logger.info(f"✅ Excel creation successful with {method_name}: {len(file_content)} bytes")
-                    return file_content, fixed_filename, validation_info
+                    result = (file_content, fixed_filename, validation_info)
+                    break
                 else:
                     logger.warning(f"❌ {method_name} created invalid file: {validation_info}")
                     
@@ -59,13 +145,108 @@ class RobustExcelService:
                 continue
         
         # If all methods fail, raise an exception
-        raise Exception("All Excel creation methods failed. Check data format and dependencies.")
+        if result is None:
+            raise Exception("All Excel creation methods failed. Check data format and dependencies.")
+        
+        # Cached outside the per-method try, so a cache failure never discards a good workbook
+        if cache_path:
+            RobustExcelService._write_cached_export(cache_path, result[0])
+        return result
+    
+    @staticmethod
+    def _get_cache_path(data, sheet_name, max_rows_per_sheet):
+        """Build the cache file path for this input, or None if it can't be hashed"""
+        try:
+            if hasattr(data, 'to_dict'):  # pandas DataFrame
+                data = data.to_dict('records')
+            
+            # Pickle keeps value types (datetime vs str, Decimal vs str, int vs str keys)
+            # and key order, which decides column order; streaming it straight into the
+            # hasher never builds the full serialization. Fast mode skips the memo, so
+            # the bytes don't depend on which equal objects happen to be shared.
+            hasher = hashlib.blake2b(digest_size=16)
+            pickler = pickle.Pickler(SimpleNamespace(write=hasher.update), protocol=5)
+            pickler.fast = True
+            pickler.dump(data)
+            hasher.update(f"{sheet_name}|{max_rows_per_sheet}".encode('utf-8'))
+            
+            return os.path.join(EXCEL_CACHE_DIR, f"{hasher.hexdigest()}.xlsx")
+        except Exception as e:
+            logger.warning(f"Excel cache key failed, generating without cache: {str(e)}")
+            return None
+    
+    @staticmethod
+    def _read_cached_export(cache_path):
+        """Return cached workbook bytes, or None on a miss"""
+        if not cache_path:
+            return None
+        try:
+            if time.time() - os.path.getmtime(cache_path) > EXCEL_CACHE_TTL_SECONDS:
+                # Expired entries hold participant data, so they go as soon as they are seen
+                os.remove(cache_path)
+                return None
+            with open(cache_path, 'rb') as f:
+                content = f.read()
+            logger.info(f"✅ Excel cache hit: {os.path.basename(cache_path)} ({len(content)} bytes)")
+            return content
+        except OSError:
+            return None
+    
+    @staticmethod
+    def _write_cached_export(cache_path, content):
+        """Store workbook bytes atomically so readers never see a partial file"""
+        temp_path = None
+        try:
+            os.makedirs(EXCEL_CACHE_DIR, exist_ok=True)
+            # A unique temp file per write, since threads in one worker can cache the same input
+            fd, temp_path = tempfile.mkstemp(dir=EXCEL_CACHE_DIR, suffix='.tmp')
+            with os.fdopen(fd, 'wb') as f:
+                f.write(content)
+            os.replace(temp_path, cache_path)
+        except OSError as e:
+            logger.warning(f"Failed to write Excel cache entry: {str(e)}")
+            if temp_path:
+                try:
+                    os.remove(temp_path)
+                except OSError:
+                    pass
+            return
+        
+        # Expire old entries so the cache doesn't grow without bound
+        RobustExcelService.purge_cache()
+    
+    @staticmethod
+    def purge_cache(max_age_seconds=EXCEL_CACHE_TTL_SECONDS):
+        """
+        Delete cached workbooks older than max_age_seconds
+        
+        Args:
+            max_age_seconds: Age limit in seconds; 0 deletes every entry
+            
+        Returns:
+            int: Number of cache files deleted
+        """
+        cutoff = time.time() - max_age_seconds
+        removed = 0
+        try:
+            with os.scandir(EXCEL_CACHE_DIR) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_file() and entry.stat().st_mtime <= cutoff:
+                            os.remove(entry.path)
+                            removed += 1
+                    except OSError:
+                        continue
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logger.warning(f"Failed to prune Excel cache: {str(e)}")
+        return removed
     
     @staticmethod
     def _fix_filename(filename):
         """Fix and validate filename"""
         if not filename:
-            from datetime import datetime
             timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
             filename = f"export_{timestamp}.xlsx"
         
@@ -76,16 +257,106 @@ class RobustExcelService:
             filename = f"{base_name}.xlsx"
         
         # Sanitize filename for filesystem compatibility
-        import re
-        filename = re.sub(r'[<>:"/\\|?*]', '_', filename)
-        filename = re.sub(r'_+', '_', filename)
+        filename = _INVALID_FILENAME_CHARS.sub('_', filename)
+        filename = _REPEATED_UNDERSCORES.sub('_', filename)
         filename = filename.strip()
         
         return filename
     
+    @staticmethod
+    def _create_with_xlsxwriter(data, sheet_name, max_rows_per_sheet=None):
+        """
+        Create using xlsxwriter, producing the same cells and styling as ExcelExporter
+        
+        Inputs longer than max_rows_per_sheet are split across numbered sheets
+        (<sheet_name>_1, <sheet_name>_2, ...), each with its own header row.
+        """
+        import xlsxwriter
+        from utils.excel_exporter import ExcelExporter
+        
+        # Convert to list of dicts if needed
+        if hasattr(data, 'to_dict'):  # pandas DataFrame
+            data = data.to_dict('records')
+        
+        if not data:
+            raise ValueError("No data to export")
+        
+        output = BytesIO()
+        # constant_memory flushes each row as soon as the next one starts
+        wb = xlsxwriter.Workbook(output, {
+            'constant_memory': True,
+            'strings_to_urls': False,
+            'strings_to_formulas': False,
+            'strings_to_numbers': False,
+            'remove_timezone': True
+        })
+        
+        # Same header style as ExcelExporter._apply_default_formatting
+        header_format = wb.add_format({
+            'bold': True,
+            'font_color': '#FFFFFF',
+            'bg_color': '#366092',
+            'align': 'center',
+            'valign': 'vcenter'
+        })
+        
+        headers = RobustExcelService._collect_headers(data)
+        header_row = [ExcelExporter.sanitize_cell_value(str(header)) or "Column" for header in headers]
+        
+        if max_rows_per_sheet and len(data) > max_rows_per_sheet:
+            for index, start in enumerate(range(0, len(data), max_rows_per_sheet), 1):
+                suffix = f"_{index}"
+                ws = wb.add_worksheet(f"{sheet_name[:31 - len(suffix)]}{suffix}")
+                RobustExcelService._write_xlsxwriter_rows(
+                    ws, data[start:start + max_rows_per_sheet], headers, header_row, header_format
+                )
+        else:
+            ws = wb.add_worksheet(sheet_name[:31])  # Excel sheet name limit
+            RobustExcelService._write_xlsxwriter_rows(ws, data, headers, header_row, header_format)
+        
+        wb.close()
+        return output.getvalue()
+    
+    @staticmethod
+    def _write_xlsxwriter_rows(ws, records, headers, header_row, header_format):
+        """Write a header row and one sanitized row per record to an xlsxwriter worksheet"""
+        from utils.excel_exporter import ExcelExporter
+        
+        ws.write_row(0, 0, header_row, header_format)
+        column_widths = [len(header) for header in header_row]
+        
+        # Write data, sanitized and typed cell by cell exactly as ExcelExporter does
+        sanitize = ExcelExporter.sanitize_cell_value
+        for row_num, row in enumerate(RobustExcelService._iter_rows(records, headers), 1):
+            cells = []
+            for col_num, value in enumerate(row):
+                clean_value = sanitize(value)
+                
+                # Numeric-looking text goes in as a number, like ExcelExporter's manual writer
+                if clean_value.replace('.', '').replace('-', '').isdigit():
+                    try:
+                        clean_value = float(clean_value) if '.' in clean_value else int(clean_value)
+                    except (ValueError, TypeError):
+                        pass
+                    cell_length = len(str(clean_value))
+                else:
+                    cell_length = len(clean_value)
+                
+                if cell_length > column_widths[col_num]:
+                    column_widths[col_num] = cell_length
+                cells.append(clean_value)
+            ws.write_row(row_num, 0, cells)
+        
+        # Auto column widths, same limits as ExcelExporter._adjust_column_widths_safe
+        for col_num, max_length in enumerate(column_widths):
+            if max_length > 0:
+                ws.set_column(col_num, col_num, max(min(max_length + 2, 50), 8))
+    
     @staticmethod
     def _create_with_excel_exporter(data, sheet_name):
         """Create using the existing ExcelExporter"""
+        from utils.excel_exporter import ExcelExporter
+        
         excel_output = ExcelExporter.create_excel_file(
             data=data,
             sheet_name=sheet_name,
@@ -102,26 +373,34 @@ class RobustExcelService:
         if isinstance(data, list):
             df = pd.DataFrame(data)
         else:
-            df = data.copy()
+            # Columns are replaced below, never edited in place, so a shallow
+            # copy keeps the caller's frame intact without duplicating its data
+            df = data.copy(deep=False)
         
-        # Basic data cleaning
+        # Basic data cleaning - one vectorised conversion per text column.
+        # Numeric and datetime columns pass through as native Excel cells.
         for col in df.columns:
-            df[col] = df[col].astype(str).apply(lambda x: str(x)[:32767] if x else "")
+            column = df[col]
+            if column.dtype == object or pd.api.types.is_string_dtype(column):
+                df[col] = column.astype(str).str.slice(0, 32767).mask(column.isna(), "")
+            elif isinstance(column.dtype, pd.DatetimeTZDtype):
+                # Excel has no timezone support
+                df[col] = column.dt.tz_localize(None)
         
-        # Create Excel file
+        # Create Excel file, preferring the faster xlsxwriter engine when installed
+        engine = 'xlsxwriter' if importlib.util.find_spec('xlsxwriter') else 'openpyxl'
         output = BytesIO()
-        with pd.ExcelWriter(output, engine='openpyxl') as writer:
+        with pd.ExcelWriter(output, engine=engine, datetime_format='yyyy-mm-dd hh:mm:ss') as writer:
             df.to_excel(writer, index=False, sheet_name=sheet_name)
         
-        output.seek(0)
         return output.getvalue()
     
     @staticmethod
     def _create_with_openpyxl(data, sheet_name):
         """Create using manual openpyxl (most compatible)"""
-        wb = Workbook()
-        ws = wb.active
-        ws.title = sheet_name[:31]  # Excel sheet name limit
+        # Write-only mode streams rows to the archive instead of holding a cell grid
+        wb = _load_openpyxl().Workbook(write_only=True)
+        ws = wb.create_sheet(title=sheet_name[:31])  # Excel sheet name limit
         
         # Convert to list of dicts if needed
         if hasattr(data, 'to_dict'):  # pandas DataFrame
@@ -130,30 +409,68 @@ class RobustExcelService:
         if not data:
             raise ValueError("No data to export")
         
-        # Write headers
-        headers = list(data[0].keys())
-        for col_num, header in enumerate(headers, 1):
-            ws.cell(row=1, column=col_num, value=str(header))
-        
-        # Write data
-        for row_num, record in enumerate(data, 2):
-            for col_num, header in enumerate(headers, 1):
-                value = record.get(header, "")
-                # Excel cell value limits
-                if isinstance(value, str) and len(value) > 32767:
-                    value = value[:32764] + "..."
-                ws.cell(row=row_num, column=col_num, value=value)
+        RobustExcelService._append_openpyxl_rows(ws, data, RobustExcelService._collect_headers(data))
         
         # Save to BytesIO
         output = BytesIO()
-        wb.save(output)
-        output.seek(0)
-        
+        RobustExcelService._save_openpyxl_workbook(wb, output)
         return output.getvalue()
     
     @staticmethod
-    def _validate_excel_content(content):
-        """Comprehensive Excel content validation"""
+    def _save_openpyxl_workbook(wb, output):
+        """Save like Workbook.save(), but with a configurable deflate level"""
+        archive = zipfile.ZipFile(output, 'w', zipfile.ZIP_DEFLATED, allowZip64=True,
+                                  compresslevel=EXCEL_ZIP_COMPRESSLEVEL)
+        wb.properties.modified = datetime.now(tz=timezone.utc).replace(tzinfo=None)
+        _load_openpyxl().ExcelWriter(wb, archive).save()
+    
+    @staticmethod
+    def _append_openpyxl_rows(ws, records, headers):
+        """Append a header row and one row per record to a write-only worksheet"""
+        openpyxl = _load_openpyxl()
+        header_cells = []
+        for header in headers:
+            cell = openpyxl.WriteOnlyCell(ws, value=str(header))
+            cell.font = openpyxl.header_font
+            cell.border = openpyxl.header_border
+            header_cells.append(cell)
+        ws.append(header_cells)
+        
+        for row in RobustExcelService._iter_rows(records, headers):
+            ws.append(row)
+    
+    @staticmethod
+    def _collect_headers(records):
+        """Union of all record keys, in first-seen order, so sparse columns aren't dropped"""
+        return list(dict.fromkeys(chain.from_iterable(records)))
+    
+    @staticmethod
+    def _iter_rows(records, headers):
+        """Yield one value tuple per record in header order, within Excel's cell limits"""
+        if len(headers) == 1:
+            get_single = itemgetter(headers[0])
+            get_row = lambda record: (get_single(record),)
+        else:
+            get_row = itemgetter(*headers)
+        
+        for record in records:
+            try:
+                row = get_row(record)
+            except KeyError:
+                # Sparse record - fall back to per-column defaults
+                row = tuple(record.get(header, "") for header in headers)
+            
+            # Excel cell value limits
+            if any(isinstance(value, str) and len(value) > 32767 for value in row):
+                row = tuple(
+                    value[:32764] + "..." if isinstance(value, str) and len(value) > 32767 else value
+                    for value in row
+                )
+            yield row
+    
+    @staticmethod
+    def _check_size_and_header(content):
+        """Size and ZIP signature checks shared by both validation levels"""
         validation_info = {
             'valid': False,
             'size_ok': False,
@@ -176,25 +493,70 @@ class RobustExcelService:
         else:
             validation_info['errors'].append(f"Invalid header: {content[:10]}")
         
-        # Excel readability check
+        return validation_info
+    
+    @staticmethod
+    def _cheap_validate(content):
+        """Size and header validation only, for backends trusted to write well-formed files"""
+        validation_info = RobustExcelService._check_size_and_header(content)
+        validation_info['excel_readable'] = validation_info['size_ok'] and validation_info['header_ok']
+        validation_info['valid'] = validation_info['excel_readable']
+        # The archive isn't opened, so the sheets are unknown rather than absent
+        validation_info['sheets_count'] = None
+        validation_info['sheet_names'] = None
+        validation_info['trusted_backend'] = True
+        return validation_info
+    
+    @staticmethod
+    def _validate_excel_content(content, thorough=None):
+        """
+        Comprehensive Excel content validation
+        
+        By default the workbook is checked at the ZIP/OOXML structure level, which
+        only reads the archive directory and xl/workbook.xml. With thorough=True, or
+        EXCEL_THOROUGH_VALIDATION set when thorough is not given, it is additionally
+        opened with openpyxl.
+        """
+        if thorough is None:
+            thorough = EXCEL_THOROUGH_VALIDATION
+        
+        validation_info = RobustExcelService._check_size_and_header(content)
+        
+        # Excel structure check
         if validation_info['size_ok'] and validation_info['header_ok']:
             try:
-                # Create temp file for validation
-                temp_file = tempfile.NamedTemporaryFile(delete=False, suffix='.xlsx')
-                temp_file.write(content)
-                temp_file.close()
+                with zipfile.ZipFile(BytesIO(content)) as archive:
+                    names = set(archive.namelist())
+                    for required in ('[Content_Types].xml', 'xl/workbook.xml'):
+                        if required not in names:
+                            raise ValueError(f"Missing {required}")
+                    workbook_xml = archive.read('xl/workbook.xml')
+                
+                sheet_names = [
+                    unescape(name.decode('utf-8'), {'&quot;': '"', '&apos;': "'"})
+                    for name in _SHEET_NAME_PATTERN.findall(workbook_xml)
+                ]
+                if not sheet_names:
+                    raise ValueError("Workbook has no sheets")
                 
-                # Try to open with openpyxl
-                wb = load_workbook(temp_file.name)
                 validation_info['excel_readable'] = True
+                validation_info['sheets_count'] = len(sheet_names)
+                validation_info['sheet_names'] = sheet_names
+                
+            except Exception as e:
+                validation_info['errors'].append(f"Excel structure check failed: {str(e)}")
+        
+        # Full openpyxl readability check
+        if thorough and validation_info['excel_readable']:
+            try:
+                # Open straight from memory; read-only mode skips building the cell grid
+                wb = _load_openpyxl().load_workbook(BytesIO(content), read_only=True, data_only=True)
                 validation_info['sheets_count'] = len(wb.sheetnames)
                 validation_info['sheet_names'] = wb.sheetnames
                 wb.close()
                 
-                # Cleanup
-                os.unlink(temp_file.name)
-                
             except Exception as e:
+                validation_info['excel_readable'] = False
                 validation_info['errors'].append(f"Excel read failed: {str(e)}")
         
         # Overall validity
@@ -6,14 +6,25 @@ import os
 import io
 import tempfile
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from datetime import datetime, date
 from typing import Dict, List, Optional, Tuple, Any
 import base64
+import hashlib
 import uuid
 import logging
+import multiprocessing
+import re
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from functools import lru_cache
 from pathlib import Path
 
 try:
+    from reportlab import rl_config
     from reportlab.pdfgen import canvas
     from reportlab.lib.pagesizes import letter, A4
     from reportlab.lib.colors import Color, HexColor
@@ -32,18 +43,127 @@ except ImportError:
 
 try:
     import PyPDF2
+    from PyPDF2.generic import DecodedStreamObject, DictionaryObject, NameObject
 except ImportError:
     pass  # Will handle in class initialization
 
 logger = logging.getLogger('ybb_api.certificate_service')
 
+TEMPLATE_CACHE_MAXSIZE = 32
+PARSED_TEMPLATE_CACHE_MAXSIZE = 16
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+
+# Any {{name}} token; matches inside longer strings as well as whole values
+PLACEHOLDER_PATTERN = re.compile(r'\{\{\s*(\w+)\s*\}\}')
+
+# One service per batch worker process, created on its first task
+_worker_service = None
+
+def _template_url_of(certificate_data: Any) -> Optional[str]:
+    """Template URL of one batch item, or None if the item doesn't carry one"""
+    template = certificate_data.get('certificate_template') if isinstance(certificate_data, dict) else None
+    return template.get('template_url') if isinstance(template, dict) else None
+
+def _generate_one_worker(template_paths: Dict[str, str], certificate_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Generate a single certificate inside a batch worker process"""
+    global _worker_service
+    if _worker_service is None:
+        _worker_service = CertificateService()
+    
+    return _worker_service.generate_certificate(
+        certificate_data, template_path=template_paths.get(_template_url_of(certificate_data))
+    )
+
+@lru_cache(maxsize=256)
+def _format_date_string(date_value: str) -> str:
+    """Format a date string for certificates, returning it unchanged if it cannot be parsed"""
+    # Try parsing common date formats
+    for fmt in ['%Y-%m-%d', '%Y-%m-%dT%H:%M:%S', '%Y-%m-%dT%H:%M:%SZ']:
+        try:
+            return datetime.strptime(date_value, fmt).strftime('%B %d, %Y')
+        except ValueError:
+            continue
+    return date_value
+
+# Block styles repeat across every certificate in a batch, so resolutions are memoized
+@lru_cache(maxsize=64)
+def _resolve_reportlab_font(font_family: str, font_weight: str) -> str:
+    """Get ReportLab font name from font family and weight"""
+    # Map common font families
+    font_map = {
+        'Arial': 'Helvetica',
+        'Times New Roman': 'Times-Roman',
+        'Courier New': 'Courier'
+    }
+    
+    base_font = font_map.get(font_family, 'Helvetica')
+    
+    # Handle font weights
+    if font_weight in ['bold', 'bolder', '600', '700', '800', '900']:
+        if base_font == 'Helvetica':
+            return 'Helvetica-Bold'
+        elif base_font == 'Times-Roman':
+            return 'Times-Bold'
+        elif base_font == 'Courier':
+            return 'Courier-Bold'
+    
+    return base_font
+
+@lru_cache(maxsize=64)
+def _resolve_color(color_str: str):
+    """Parse color string to ReportLab Color object"""
+    try:
+        if color_str.startswith('#'):
+            return HexColor(color_str)
+        else:
+            # Handle named colors
+            color_map = {
+                'black': '#000000',
+                'white': '#ffffff',
+                'red': '#ff0000',
+                'green': '#00ff00',
+                'blue': '#0000ff',
+                'gray': '#808080',
+                'grey': '#808080'
+            }
+            return HexColor(color_map.get(color_str.lower(), '#000000'))
+    except:
+        return HexColor('#000000')  # Default to black
+
 class CertificateService:
     """Service for generating certificates from templates and content blocks"""
     
+    # Downloaded templates shared by every instance in the process:
+    # template_url -> (local path, ETag, Last-Modified), least recently used first
+    _template_cache: "OrderedDict[str, Tuple[Path, Optional[str], Optional[str]]]" = OrderedDict()
+    _template_cache_lock = threading.Lock()
+    
+    # Template first pages already parsed and normalized, serialized back to PDF bytes, by content digest
+    _parsed_template_cache: "OrderedDict[bytes, bytes]" = OrderedDict()
+    _parsed_template_lock = threading.Lock()
+    
+    # Batch worker pools by size, kept for the life of the process so later batches skip
+    # interpreter start-up and reuse each worker's warm template caches
+    _batch_executors: Dict[int, ProcessPoolExecutor] = {}
+    _batch_executors_lock = threading.Lock()
+    
     def __init__(self):
         """Initialize certificate service"""
         self.temp_dir = Path("temp/certificates")
         self.temp_dir.mkdir(parents=True, exist_ok=True)
+        # Cached templates live in a subdirectory so the 1-hour temp cleanup leaves them alone
+        self.template_cache_dir = self.temp_dir / "cache"
+        self.template_cache_dir.mkdir(parents=True, exist_ok=True)
+        
+        # Pooled keep-alive session so repeated template fetches skip the TCP/TLS handshake
+        self._http = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=16,
+            pool_maxsize=32,
+            max_retries=Retry(total=3, backoff_factor=0.2, status_forcelist=[502, 503, 504])
+        )
+        self._http.mount('https://', adapter)
+        self._http.mount('http://', adapter)
         
         # Check required dependencies and set availability
         self.dependencies_available = True
@@ -97,6 +217,10 @@ class CertificateService:
     
     def _setup_fonts(self):
         """Setup available fonts for PDF generation"""
+        # Attribute validation is only worth its per-call cost while debugging
+        if os.environ.get('FLASK_DEBUG', 'False').lower() != 'true':
+            rl_config.shapeChecking = 0
+        
         try:
             # Register standard fonts
             standard_fonts = {
@@ -119,12 +243,14 @@ class CertificateService:
                 'Courier New': 'Courier'
             }
     
-    def generate_certificate(self, certificate_data: Dict[str, Any]) -> Dict[str, Any]:
+    def generate_certificate(self, certificate_data: Dict[str, Any],
+                             template_path: Optional[str] = None) -> Dict[str, Any]:
         """
         Generate a certificate from provided data
         
         Args:
             certificate_data: Dictionary containing all certificate data
+            template_path: Local copy of the template, skips the download when given
             
         Returns:
             Dictionary with certificate generation result
@@ -167,7 +293,10 @@ class CertificateService:
             logger.info(f"CERTIFICATE_DATA_EXTRACTED | ID: {request_id} | Participant: {participant['full_name']}")
             
             # Download and process template
-            template_result = self._download_template(certificate_template)
+            if template_path:
+                template_result = {'success': True, 'template_path': template_path}
+            else:
+                template_result = self._download_template(certificate_template)
             if not template_result['success']:
                 logger.error(f"CERTIFICATE_TEMPLATE_FAILED | ID: {request_id} | Error: {template_result['error']}")
                 return {
@@ -247,6 +376,102 @@ class CertificateService:
             # Cleanup temporary files
             self._cleanup_temp_files()
     
+    def generate_batch(self, items: List[Dict[str, Any]],
+                       max_workers: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Generate many certificates in parallel worker processes
+        
+        Args:
+            items: List of certificate data dictionaries, as for generate_certificate
+            max_workers: Number of worker processes (defaults to the CPU count); the
+                pool is started on first use and reused by later batches
+            
+        Returns:
+            List of generate_certificate results, in the same order as items
+        """
+        if not self.dependencies_available or not items:
+            return [self.generate_certificate(item) for item in items]
+        
+        # Download each distinct template once and hand the local path to every worker
+        template_paths = {}
+        for item in items:
+            template_url = _template_url_of(item)
+            if not template_url or template_url in template_paths:
+                continue
+            template_result = self._download_template(item['certificate_template'])
+            template_paths[template_url] = template_result.get('template_path')
+        template_paths = {url: path for url, path in template_paths.items() if path}
+        
+        max_workers = max_workers or os.cpu_count() or 1
+        if min(max_workers, len(items)) <= 1:
+            return [
+                self.generate_certificate(item, template_path=template_paths.get(_template_url_of(item)))
+                for item in items
+            ]
+        
+        logger.info(f"CERTIFICATE_BATCH_START | Items: {len(items)} | Workers: {min(max_workers, len(items))}")
+        
+        # Keyed by the worker cap, not the batch size: spawned pools only start workers as needed
+        executor = self._get_batch_executor(max_workers)
+        try:
+            futures = {
+                executor.submit(_generate_one_worker, template_paths, item): index
+                for index, item in enumerate(items)
+            }
+        except BrokenProcessPool:
+            # A worker died since the last batch; replace the pool and submit again
+            self._discard_batch_executor(max_workers, executor)
+            executor = self._get_batch_executor(max_workers)
+            futures = {
+                executor.submit(_generate_one_worker, template_paths, item): index
+                for index, item in enumerate(items)
+            }
+        
+        results: List[Optional[Dict[str, Any]]] = [None] * len(items)
+        pool_broken = False
+        for future in as_completed(futures):
+            index = futures[future]
+            try:
+                results[index] = future.result()
+            except Exception as e:
+                pool_broken = pool_broken or isinstance(e, BrokenProcessPool)
+                logger.error(f"CERTIFICATE_BATCH_ITEM_FAILED | Index: {index} | Error: {str(e)}")
+                results[index] = {
+                    'success': False,
+                    'error': {
+                        'code': 'GENERATION_FAILED',
+                        'message': f'Certificate generation failed: {str(e)}'
+                    }
+                }
+        
+        if pool_broken:
+            self._discard_batch_executor(max_workers, executor)
+        
+        logger.info(f"CERTIFICATE_BATCH_COMPLETE | Items: {len(items)}")
+        return results
+    
+    @classmethod
+    def _get_batch_executor(cls, max_workers: int) -> ProcessPoolExecutor:
+        """Return the shared worker pool of this size, starting it on first use"""
+        with cls._batch_executors_lock:
+            executor = cls._batch_executors.get(max_workers)
+            if executor is None:
+                # Spawn fresh interpreters: forking a threaded gunicorn worker can copy locks held
+                # by other request threads into the children, which then deadlock on them
+                executor = ProcessPoolExecutor(
+                    max_workers=max_workers, mp_context=multiprocessing.get_context('spawn')
+                )
+                cls._batch_executors[max_workers] = executor
+            return executor
+    
+    @classmethod
+    def _discard_batch_executor(cls, max_workers: int, executor: ProcessPoolExecutor):
+        """Drop a broken worker pool so the next batch starts a new one"""
+        with cls._batch_executors_lock:
+            if cls._batch_executors.get(max_workers) is executor:
+                del cls._batch_executors[max_workers]
+        executor.shutdown(wait=False, cancel_futures=True)
+    
     def _validate_certificate_data(self, data: Dict[str, Any]) -> Dict[str, Any]:
         """Validate certificate generation data"""
         errors = {}
@@ -330,32 +555,71 @@ class CertificateService:
         }
     
     def _download_template(self, template_info: Dict[str, Any]) -> Dict[str, Any]:
-        """Download certificate template from URL"""
+        """Download certificate template from URL, reusing the cached copy while it is unchanged"""
         try:
             template_url = template_info['template_url']
             template_type = template_info.get('template_type', 'pdf')
             
-            logger.info(f"Downloading template from: {template_url}")
-            
-            # Download template file
-            response = requests.get(template_url, timeout=30)
-            response.raise_for_status()
+            with self._template_cache_lock:
+                cached = self._template_cache.get(template_url)
+                if cached is not None:
+                    self._template_cache.move_to_end(template_url)
+            
+            # Revalidate the cached copy with a conditional GET
+            headers = {}
+            if cached is not None and cached[0].exists():
+                cached_path, etag, last_modified = cached
+                if etag:
+                    headers['If-None-Match'] = etag
+                if last_modified:
+                    headers['If-Modified-Since'] = last_modified
+            else:
+                cached = None
             
-            # Generate temporary file path
-            file_extension = 'pdf' if template_type == 'pdf' else 'png'
-            temp_filename = f"template_{uuid.uuid4().hex[:8]}.{file_extension}"
-            template_path = self.temp_dir / temp_filename
+            logger.info(f"Downloading template from: {template_url}")
             
-            # Save template file
-            with open(template_path, 'wb') as f:
-                f.write(response.content)
+            with self._http.get(template_url, headers=headers, timeout=30, stream=True) as response:
+                if cached is not None and headers and response.status_code == 304:
+                    logger.info(f"Template unchanged, using cached copy: {cached_path}")
+                    # Other workers sharing the cache directory clean up by age, so mark it as in use
+                    try:
+                        os.utime(cached_path)
+                    except OSError:
+                        pass
+                    return {
+                        'success': True,
+                        'template_path': str(cached_path),
+                        'file_size': cached_path.stat().st_size
+                    }
+                
+                response.raise_for_status()
+                
+                # One stable file per URL; written under a unique name and moved into place
+                file_extension = 'pdf' if template_type == 'pdf' else 'png'
+                url_hash = hashlib.sha1(template_url.encode('utf-8')).hexdigest()
+                template_path = self.template_cache_dir / f"{url_hash}.{file_extension}"
+                partial_path = self.template_cache_dir / f"{url_hash}.{uuid.uuid4().hex[:8]}.part"
+                
+                try:
+                    with open(partial_path, 'wb') as f:
+                        for chunk in response.iter_content(DOWNLOAD_CHUNK_SIZE):
+                            f.write(chunk)
+                    os.replace(partial_path, template_path)
+                except Exception:
+                    partial_path.unlink(missing_ok=True)
+                    raise
+                
+                self._remember_template(
+                    template_url, template_path,
+                    response.headers.get('ETag'), response.headers.get('Last-Modified')
+                )
             
             logger.info(f"Template downloaded successfully: {template_path}")
             
             return {
                 'success': True,
                 'template_path': str(template_path),
-                'file_size': len(response.content)
+                'file_size': template_path.stat().st_size
             }
             
         except Exception as e:
@@ -365,12 +629,36 @@ class CertificateService:
                 'error': str(e)
             }
     
+    def _remember_template(self, template_url: str, template_path: Path,
+                           etag: Optional[str], last_modified: Optional[str]):
+        """Record a downloaded template in the LRU cache, evicting the oldest entries"""
+        with self._template_cache_lock:
+            self._template_cache[template_url] = (template_path, etag, last_modified)
+            self._template_cache.move_to_end(template_url)
+            
+            while len(self._template_cache) > TEMPLATE_CACHE_MAXSIZE:
+                _, (evicted_path, _, _) = self._template_cache.popitem(last=False)
+                # Other threads may still be reading it; the temp cleanup deletes it an hour after eviction
+                try:
+                    os.utime(evicted_path)
+                except OSError:
+                    pass
+    
     def _process_content_blocks(self, blocks: List[Dict], participant: Dict, 
                               program: Dict, award: Dict, template: Dict) -> List[Dict]:
         """Process content blocks and replace placeholders"""
         try:
             # Create placeholder mappings
             placeholder_map = self._create_placeholder_map(participant, program, award, template)
+            unknown_placeholders = []
+            
+            def replace_placeholder(match):
+                placeholder = f"{{{{{match.group(1)}}}}}"
+                if placeholder in placeholder_map:
+                    return str(placeholder_map[placeholder])
+                unknown_placeholders.append(placeholder)
+                # Keep the bare name if no mapping found
+                return match.group(1)
             
             processed_blocks = []
             
@@ -378,18 +666,16 @@ class CertificateService:
                 processed_block = block.copy()
                 
                 if block['type'] == 'placeholder':
-                    # Replace placeholder with actual value
-                    placeholder_value = block['value']
-                    if placeholder_value in placeholder_map:
-                        processed_block['value'] = placeholder_map[placeholder_value]
-                        logger.debug(f"Replaced placeholder {placeholder_value} with {processed_block['value']}")
-                    else:
-                        # Keep original value if no mapping found
-                        logger.warning(f"No mapping found for placeholder: {placeholder_value}")
-                        processed_block['value'] = placeholder_value.replace('{{', '').replace('}}', '')
+                    # Replace every placeholder in the value in one regex pass
+                    placeholder_value = str(block['value'])
+                    processed_block['value'] = PLACEHOLDER_PATTERN.sub(replace_placeholder, placeholder_value)
+                    logger.debug(f"Replaced placeholder {placeholder_value} with {processed_block['value']}")
                 
                 processed_blocks.append(processed_block)
             
+            for placeholder in unknown_placeholders:
+                logger.warning(f"No mapping found for placeholder: {placeholder}")
+            
             return processed_blocks
             
         except Exception as e:
@@ -405,17 +691,8 @@ class CertificateService:
                 return ""
             
             if isinstance(date_value, str):
-                try:
-                    # Try parsing common date formats
-                    for fmt in ['%Y-%m-%d', '%Y-%m-%dT%H:%M:%S', '%Y-%m-%dT%H:%M:%SZ']:
-                        try:
-                            parsed_date = datetime.strptime(date_value, fmt)
-                            return parsed_date.strftime('%B %d, %Y')
-                        except ValueError:
-                            continue
-                    return date_value
-                except:
-                    return date_value
+                # Program and issue dates repeat across a batch, so parsed strings are memoized
+                return _format_date_string(date_value)
             elif isinstance(date_value, (datetime, date)):
                 return date_value.strftime('%B %d, %Y')
             else:
@@ -483,49 +760,103 @@ class CertificateService:
                                    output_buffer: io.BytesIO) -> Dict[str, Any]:
         """Generate certificate from PDF template"""
         try:
-            # Read the original PDF
-            with open(template_path, 'rb') as template_file:
-                template_pdf = PyPDF2.PdfReader(template_file)
-                
-                if len(template_pdf.pages) == 0:
-                    raise ValueError("Template PDF has no pages")
-                
-                # Get first page (assuming single-page certificate)
-                template_page = template_pdf.pages[0]
-                page_width = float(template_page.mediabox.width)
-                page_height = float(template_page.mediabox.height)
-                
-                # Create overlay with content blocks
-                overlay_buffer = io.BytesIO()
-                overlay_canvas = canvas.Canvas(overlay_buffer, pagesize=(page_width, page_height))
-                
-                # Add content blocks to overlay
-                for block in content_blocks:
-                    self._add_content_block_to_canvas(overlay_canvas, block, page_height)
-                
-                overlay_canvas.save()
-                overlay_buffer.seek(0)
-                
-                # Create overlay PDF reader
-                overlay_pdf = PyPDF2.PdfReader(overlay_buffer)
-                overlay_page = overlay_pdf.pages[0]
-                
-                # Merge template and overlay
-                template_page.merge_page(overlay_page)
-                
-                # Write final PDF
-                writer = PyPDF2.PdfWriter()
-                writer.add_page(template_page)
-                writer.write(output_buffer)
-                
-                overlay_buffer.close()
-                
-                return {'success': True}
-                
+            # Start from the cached, already-normalized first page of the template
+            template_pdf = PyPDF2.PdfReader(io.BytesIO(self._get_parsed_template(template_path)))
+            template_page = template_pdf.pages[0]
+            page_width = float(template_page.mediabox.width)
+            page_height = float(template_page.mediabox.height)
+            
+            # Merge template and overlay
+            template_page.merge_page(self._render_overlay_page(content_blocks, page_width, page_height))
+            
+            # Write final PDF
+            writer = PyPDF2.PdfWriter()
+            writer.add_page(template_page)
+            writer.write(output_buffer)
+            
+            return {'success': True}
+            
         except Exception as e:
             logger.error(f"PDF template processing failed: {str(e)}")
             return {'success': False, 'error': str(e)}
     
+    def _get_parsed_template(self, template_path: str) -> bytes:
+        """Return the template's first page as a standalone single-page PDF, parsed once per template"""
+        with open(template_path, 'rb') as template_file:
+            template_bytes = template_file.read()
+        
+        # Keyed on content, so a re-downloaded template is parsed again whatever its path or mtime
+        cache_key = hashlib.blake2b(template_bytes, digest_size=16).digest()
+        
+        with self._parsed_template_lock:
+            cached = self._parsed_template_cache.get(cache_key)
+            if cached is not None:
+                self._parsed_template_cache.move_to_end(cache_key)
+                return cached
+        
+        template_pdf = PyPDF2.PdfReader(io.BytesIO(template_bytes))
+        if len(template_pdf.pages) == 0:
+            raise ValueError("Template PDF has no pages")
+        
+        # add_page copies the first page (assuming single-page certificate) and every
+        # object it references into the writer
+        writer = PyPDF2.PdfWriter()
+        page = writer.add_page(template_pdf.pages[0])
+        
+        # merge_page re-parses the base page's content stream on every call, so move the
+        # template drawing into a Form XObject and leave the page with a one-line "Do"
+        contents = page.get_contents()
+        if contents is None:
+            template_form = DecodedStreamObject()
+            template_form.set_data(b'')
+        elif isinstance(contents, list):
+            template_stream = DecodedStreamObject()
+            template_stream.set_data(b'\n'.join(stream.get_object().get_data() for stream in contents))
+            template_form = template_stream.flate_encode()
+        else:
+            # The stream keeps its existing filter, so its data is never decoded or re-encoded
+            template_form = contents
+        
+        template_form.update({
+            NameObject('/Type'): NameObject('/XObject'),
+            NameObject('/Subtype'): NameObject('/Form'),
+            NameObject('/BBox'): page.mediabox,
+            NameObject('/Resources'): page.get('/Resources', DictionaryObject())
+        })
+        form_reference = template_form.indirect_reference
+        if form_reference is None or form_reference.pdf is not writer:
+            form_reference = writer._add_object(template_form)
+        
+        page_content = DecodedStreamObject()
+        page_content.set_data(b'q /Template Do Q')
+        page[NameObject('/Resources')] = DictionaryObject({
+            NameObject('/XObject'): DictionaryObject({NameObject('/Template'): form_reference})
+        })
+        page[NameObject('/Contents')] = writer._add_object(page_content)
+        
+        page_buffer = io.BytesIO()
+        writer.write(page_buffer)
+        parsed = page_buffer.getvalue()
+        
+        with self._parsed_template_lock:
+            self._parsed_template_cache[cache_key] = parsed
+            while len(self._parsed_template_cache) > PARSED_TEMPLATE_CACHE_MAXSIZE:
+                self._parsed_template_cache.popitem(last=False)
+        
+        return parsed
+    
+    def _render_overlay_page(self, content_blocks: List[Dict], page_width: float, page_height: float):
+        """Draw content blocks on a blank page of the given size and return it as a PDF page"""
+        overlay_buffer = io.BytesIO()
+        overlay_canvas = canvas.Canvas(overlay_buffer, pagesize=(page_width, page_height))
+        
+        for block in content_blocks:
+            self._add_content_block_to_canvas(overlay_canvas, block, page_height)
+        
+        overlay_canvas.save()
+        overlay_buffer.seek(0)
+        return PyPDF2.PdfReader(overlay_buffer).pages[0]
+    
     def _generate_from_image_template(self, template_path: str, content_blocks: List[Dict], 
                                      output_buffer: io.BytesIO) -> Dict[str, Any]:
         """Generate certificate from image template"""
@@ -607,45 +938,11 @@ class CertificateService:
     
     def _get_reportlab_font(self, font_family: str, font_weight: str) -> str:
         """Get ReportLab font name from font family and weight"""
-        # Map common font families
-        font_map = {
-            'Arial': 'Helvetica',
-            'Times New Roman': 'Times-Roman',
-            'Courier New': 'Courier'
-        }
-        
-        base_font = font_map.get(font_family, 'Helvetica')
-        
-        # Handle font weights
-        if font_weight in ['bold', 'bolder', '600', '700', '800', '900']:
-            if base_font == 'Helvetica':
-                return 'Helvetica-Bold'
-            elif base_font == 'Times-Roman':
-                return 'Times-Bold'
-            elif base_font == 'Courier':
-                return 'Courier-Bold'
-        
-        return base_font
+        return _resolve_reportlab_font(font_family, str(font_weight))
     
     def _parse_color(self, color_str: str):
         """Parse color string to ReportLab Color object"""
-        try:
-            if color_str.startswith('#'):
-                return HexColor(color_str)
-            else:
-                # Handle named colors
-                color_map = {
-                    'black': HexColor('#000000'),
-                    'white': HexColor('#ffffff'),
-                    'red': HexColor('#ff0000'),
-                    'green': HexColor('#00ff00'),
-                    'blue': HexColor('#0000ff'),
-                    'gray': HexColor('#808080'),
-                    'grey': HexColor('#808080')
-                }
-                return color_map.get(color_str.lower(), HexColor('#000000'))
-        except:
-            return HexColor('#000000')  # Default to black
+        return _resolve_color(str(color_str))
     
     def _generate_filename(self, participant: Dict, award: Dict) -> str:
         """Generate certificate filename"""
@@ -678,5 +975,17 @@ class CertificateService:
                         if file_age > 3600:  # 1 hour
                             file_path.unlink()
                             logger.debug(f"Cleaned up old temp file: {file_path}")
+                
+                # Cached templates stay while they are in the LRU cache; evicted and
+                # abandoned partial downloads go once they are an hour old
+                with self._template_cache_lock:
+                    cached_paths = {entry[0] for entry in self._template_cache.values()}
+                for file_path in self.template_cache_dir.glob('*'):
+                    if file_path in cached_paths or not file_path.is_file():
+                        continue
+                    file_age = current_time - file_path.stat().st_mtime
+                    if file_age > 3600:  # 1 hour
+                        file_path.unlink(missing_ok=True)
+                        logger.debug(f"Cleaned up evicted template: {file_path}")
         except Exception as e:
             logger.warning(f"Temp file cleanup failed: {e}")
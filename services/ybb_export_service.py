@@ -8,6 +8,7 @@ import tempfile
 import zipfile
 from io import BytesIO
 import logging
+import threading
 import time
 from openpyxl import Workbook
 
@@ -80,6 +81,8 @@ class YBBExportService:
         os.makedirs(self.temp_dir, exist_ok=True)
         
         self.exports_storage = {}  # In production, use Redis or database
+        # Guards exports_storage across gunicorn gthread request threads
+        self._storage_lock = threading.Lock()
         self.file_manager = ExportFileManager()
         
         # Get cleanup configuration from config file
@@ -259,7 +262,8 @@ class YBBExportService:
                 "expires_at": datetime.now() + timedelta(days=SYSTEM_CONFIG["limits"]["file_retention_days"])
             }
             
-            self.exports_storage[export_id] = export_info
+            with self._storage_lock:
+                self.exports_storage[export_id] = export_info
             
             return {
                 "status": "success",
@@ -450,7 +454,8 @@ class YBBExportService:
             
             system_info_payload["export_expires_at"] = export_info["expires_at"].isoformat()
             
-            self.exports_storage[export_id] = export_info
+            with self._storage_lock:
+                self.exports_storage[export_id] = export_info
             
             return {
                 "status": "success",
@@ -855,11 +860,10 @@ class YBBExportService:
     
     def get_export_status(self, export_id):
         """Get export status and download information with detailed metrics"""
-        if export_id not in self.exports_storage:
+        export_info = self.exports_storage.get(export_id)
+        if export_info is None:
             return {"status": "error", "message": "Export not found"}
         
-        export_info = self.exports_storage[export_id]
-        
         # Check if expired
         if datetime.now() > export_info["expires_at"]:
             self._cleanup_export(export_id)
@@ -905,11 +909,12 @@ class YBBExportService:
     
     def download_export(self, export_id, file_type="single"):
         """Download export file(s)"""
-        if export_id not in self.exports_storage:
-            logger.error(f"Export {export_id} not found in storage. Available exports: {list(self.exports_storage.keys())[:5]}")
+        export_info = self.exports_storage.get(export_id)
+        if export_info is None:
+            with self._storage_lock:
+                available_exports = list(self.exports_storage.keys())[:5]
+            logger.error(f"Export {export_id} not found in storage. Available exports: {available_exports}")
             return None, None
-
-        export_info = self.exports_storage[export_id]
         
         # Log export info for debugging
         logger.debug(f"Downloading export {export_id}: type={export_info.get('export_type')}, filename={export_info.get('filename')}")
@@ -951,11 +956,10 @@ class YBBExportService:
     
     def download_batch_file(self, export_id, batch_number):
         """Download specific batch file"""
-        if export_id not in self.exports_storage:
+        export_info = self.exports_storage.get(export_id)
+        if export_info is None:
             return None, None
         
-        export_info = self.exports_storage[export_id]
-        
         if "files_info" in export_info:
             for file_info in export_info["files_info"]:
                 if file_info["batch_number"] == batch_number:
@@ -982,8 +986,10 @@ class YBBExportService:
             current_time = datetime.now()
             
             # Sort exports by creation time (newest first)
+            with self._storage_lock:
+                storage_snapshot = list(self.exports_storage.items())
             exports_by_time = sorted(
-                self.exports_storage.items(), 
+                storage_snapshot, 
                 key=lambda x: x[1].get("created_at", datetime.min), 
                 reverse=True
             )
@@ -1025,8 +1031,10 @@ class YBBExportService:
         """Clean up old exports to maintain only the most recent ones"""
         try:
             # Get list of exports sorted by creation time (newest first)
+            with self._storage_lock:
+                storage_snapshot = list(self.exports_storage.items())
             exports_by_time = sorted(
-                self.exports_storage.items(), 
+                storage_snapshot, 
                 key=lambda x: x[1].get("created_at", datetime.min), 
                 reverse=True
             )
@@ -1044,10 +1052,12 @@ class YBBExportService:
     
     def _cleanup_export(self, export_id):
         """Clean up export files and data"""
-        if export_id not in self.exports_storage:
+        # Remove from storage first so concurrent cleanups never process the same export twice
+        with self._storage_lock:
+            export_info = self.exports_storage.pop(export_id, None)
+        if export_info is None:
             return
-            
-        export_info = self.exports_storage[export_id]
+        
         files_cleaned = 0
         
         try:
@@ -1084,23 +1094,20 @@ class YBBExportService:
                         except Exception as e:
                             logger.warning(f"Failed to delete batch file {file_path}: {str(e)}")
             
-            # Remove from storage
-            del self.exports_storage[export_id]
-            
             logger.info(f"Cleaned up export {export_id}: {files_cleaned} files deleted")
             
         except Exception as e:
             logger.error(f"Error cleaning up export {export_id}: {str(e)}")
-            # Still try to remove from storage even if file cleanup failed
-            if export_id in self.exports_storage:
-                del self.exports_storage[export_id]
     
     def cleanup_expired_exports(self):
         """Clean up all expired exports"""
         expired_exports = []
         current_time = datetime.now()
         
-        for export_id, export_info in self.exports_storage.items():
+        with self._storage_lock:
+            storage_snapshot = list(self.exports_storage.items())
+        
+        for export_id, export_info in storage_snapshot:
             if current_time > export_info["expires_at"]:
                 expired_exports.append(export_id)
         
@@ -1108,26 +1115,36 @@ class YBBExportService:
             logger.info(f"Cleaning up expired export: {export_id}")
             self._cleanup_export(export_id)
         
-        logger.info(f"Cleaned up {len(expired_exports)} expired exports")
+        # Cached workbooks hold the same participant data as the exports
+        from robust_excel_service import RobustExcelService
+        cache_files = RobustExcelService.purge_cache()
+        
+        logger.info(f"Cleaned up {len(expired_exports)} expired exports and {cache_files} cached workbooks")
         return len(expired_exports)
     
     def force_cleanup_all_exports(self):
         """Force cleanup of all exports (admin function)"""
-        export_ids = list(self.exports_storage.keys())
+        with self._storage_lock:
+            export_ids = list(self.exports_storage.keys())
         
         for export_id in export_ids:
             self._cleanup_export(export_id)
         
-        logger.info(f"Force cleaned up {len(export_ids)} exports")
+        from robust_excel_service import RobustExcelService
+        cache_files = RobustExcelService.purge_cache(max_age_seconds=0)
+        
+        logger.info(f"Force cleaned up {len(export_ids)} exports and {cache_files} cached workbooks")
         return len(export_ids)
     
     def get_storage_info(self):
         """Get information about current storage usage"""
-        total_exports = len(self.exports_storage)
+        with self._storage_lock:
+            stored_exports = list(self.exports_storage.values())
+        total_exports = len(stored_exports)
         total_files = 0
         total_size = 0
         
-        for export_info in self.exports_storage.values():
+        for export_info in stored_exports:
             # Count temp files
             if "temp_files" in export_info:
                 for temp_file in export_info["temp_files"]:
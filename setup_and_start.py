@@ -3,7 +3,6 @@
 Setup and startup script for hosting platforms
 This installs dependencies and then starts the Flask app
 """
-import subprocess
 import sys
 import os
 
@@ -14,6 +13,8 @@ def install_requirements():
         print("✅ Flask already installed")
     except ImportError:
         print("📦 Installing requirements...")
+        # Only needed on the install path; warm starts never touch it
+        import subprocess
         try:
             subprocess.check_call([sys.executable, '-m', 'pip', 'install', '-r', 'requirements.txt'])
             print("✅ Requirements installed successfully")
@@ -0,0 +1,146 @@
+"""
+Test certificate generation from the checked-in KYS template
+Serves the template over a local HTTP server so the download and caching paths run too
+"""
+import base64
+import functools
+import http.server
+import io
+import os
+import threading
+
+import PyPDF2
+
+from services import certificate_service
+from services.certificate_service import CertificateService
+
+TEMPLATE_FILENAME = "KYS Certif Delegates all Kosongan .pdf"
+PROJECT_ROOT = os.path.dirname(os.path.abspath(__file__))
+
+
+class QuietHandler(http.server.SimpleHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+def start_template_server():
+    """Serve the project directory on a free local port and return the template URL"""
+    handler = functools.partial(QuietHandler, directory=PROJECT_ROOT)
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    template_url = f"http://127.0.0.1:{server.server_port}/{TEMPLATE_FILENAME.replace(' ', '%20')}"
+    return server, template_url
+
+
+def build_certificate_data(template_url, participant_id, participant_name, cert_number):
+    """Same block layout as test_real_certificate.py: a name placeholder and a per-participant text block"""
+    return {
+        "participant": {"id": participant_id, "full_name": participant_name},
+        "program": {"id": 1, "name": "Youth Break the Boundaries 2025"},
+        "award": {"id": 1, "title": "Certificate of Participation"},
+        "certificate_template": {"id": 1, "template_url": template_url, "template_type": "pdf"},
+        "content_blocks": [
+            {
+                "id": 1, "type": "placeholder", "value": "{{participant_name}}",
+                "x": 421, "y": 268, "font_size": 24, "font_family": "Times New Roman",
+                "font_weight": "bold", "text_align": "center", "color": "#000000"
+            },
+            {
+                "id": 2, "type": "text", "value": cert_number,
+                "x": 100, "y": 89, "font_size": 12, "font_family": "Arial",
+                "font_weight": "normal", "text_align": "left", "color": "#000000"
+            }
+        ]
+    }
+
+
+def check_certificate_pdf(result, participant_name, cert_number):
+    """Assert the generated PDF is complete and carries this participant's text"""
+    assert result['success'], result.get('error')
+    pdf_bytes = base64.b64decode(result['data']['file_data'])
+
+    reader = PyPDF2.PdfReader(io.BytesIO(pdf_bytes))
+    assert len(reader.pages) == 1
+    page = reader.pages[0]
+    assert round(float(page.mediabox.width)) == 842
+
+    # Copying the page resolves every object it references, so dangling references fail here
+    copy_buffer = io.BytesIO()
+    writer = PyPDF2.PdfWriter()
+    writer.add_page(page)
+    writer.write(copy_buffer)
+
+    # The template drawing must still be on the page, not just the overlay text
+    assert len(pdf_bytes) > 500 * 1024, f"Certificate is only {len(pdf_bytes)} bytes"
+
+    text = page.extract_text()
+    assert participant_name in text
+    assert cert_number in text
+
+
+def test_generate_from_checked_in_template():
+    """Generate several certificates from the real template through the download and cache paths"""
+    server, template_url = start_template_server()
+    try:
+        service = CertificateService()
+        participants = [
+            ("John Michael Anderson", "KYS/2025/001"),
+            ("Sarah Elizabeth Thompson", "KYS/2025/002"),
+            ("Ahmad Faisal Ibrahim", "KYS/2025/003"),
+            ("Maria Sofia Rodriguez", "KYS/2025/004"),
+            ("David Chen Wei", "KYS/2025/005"),
+        ]
+
+        for participant_id, (name, cert_number) in enumerate(participants, 1):
+            result = service.generate_certificate(
+                build_certificate_data(template_url, participant_id, name, cert_number)
+            )
+            check_certificate_pdf(result, name, cert_number)
+
+        print(f"✅ Generated {len(participants)} certificates from {TEMPLATE_FILENAME}")
+    finally:
+        server.shutdown()
+
+
+def test_generate_batch_from_checked_in_template():
+    """Generate a batch in worker processes; results keep item order and a bad item fails alone"""
+    server, template_url = start_template_server()
+    try:
+        service = CertificateService()
+        participants = [
+            ("John Michael Anderson", "KYS/2025/101"),
+            ("Sarah Elizabeth Thompson", "KYS/2025/102"),
+            ("Ahmad Faisal Ibrahim", "KYS/2025/103"),
+        ]
+        items = [
+            build_certificate_data(template_url, participant_id, name, cert_number)
+            for participant_id, (name, cert_number) in enumerate(participants, 1)
+        ]
+        invalid_item = build_certificate_data(template_url, 99, "Missing Award", "KYS/2025/199")
+        del invalid_item["award"]
+        items.insert(1, invalid_item)
+
+        for _ in range(2):
+            results = service.generate_batch(items, max_workers=2)
+
+            assert len(results) == len(items)
+            assert not results[1]['success']
+            for result, (name, cert_number) in zip(results[:1] + results[2:], participants):
+                check_certificate_pdf(result, name, cert_number)
+
+        # Both batches ran on the same worker pool
+        assert list(CertificateService._batch_executors) == [2]
+
+        # A single worker runs in this process on this service instance
+        results = service.generate_batch(items[:1], max_workers=1)
+        check_certificate_pdf(results[0], *participants[0])
+        assert certificate_service._worker_service is None
+
+        print(f"✅ Generated batches of {len(items)} items in worker processes")
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    test_generate_from_checked_in_template()
+    test_generate_batch_from_checked_in_template()
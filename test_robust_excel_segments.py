@@ -0,0 +1,42 @@
+"""
+Test that exports split across sheets are sanitized like single-sheet exports
+"""
+from io import BytesIO
+
+from openpyxl import load_workbook
+
+from robust_excel_service import RobustExcelService
+
+
+def test_segmented_export_is_sanitized():
+    """Formula-like and control-character cells stay inert text in every segment sheet"""
+    data = [
+        {"id": i, "name": "=1+1" if i % 2 else "bell\x07name", "phone": "0812"}
+        for i in range(7)
+    ]
+
+    content, _, validation_info = RobustExcelService.create_excel_file_robust(
+        data, "segments", use_cache=False, max_rows_per_sheet=3
+    )
+    assert validation_info['valid']
+
+    wb = load_workbook(BytesIO(content))
+    assert wb.sheetnames == ["Data_1", "Data_2", "Data_3"]
+
+    rows = []
+    for ws in wb:
+        header, *data_rows = ws.iter_rows()
+        assert [cell.value for cell in header] == ["id", "name", "phone"]
+        rows.extend(data_rows)
+
+    assert len(rows) == len(data)
+    for row in rows:
+        name_cell = row[1]
+        assert name_cell.data_type == 's'
+        assert name_cell.value in ("'=1+1", "bell name")
+
+    print(f"✅ {len(rows)} rows sanitized across {len(wb.sheetnames)} sheets")
+
+
+if __name__ == "__main__":
+    test_segmented_export_is_sanitized()